@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
-import base64
+import hashlib
+import json
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any
+from types import SimpleNamespace
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+)
 
 from odev.common import args, progress
 from odev.common.commands import DatabaseCommand
@@ -15,12 +25,40 @@ from odev.common.logging import logging
 from odev.common.odoobin import OdoobinProcess
 
 from odev.plugins.odev_plugin_ai.common.llm import LLM
-from odev.plugins.odev_plugin_ai.common.odoo_context import Context, OdooContext
+from odev.plugins.odev_plugin_ai.common.odoo_context import OdooContext
+from odev.plugins.odev_plugin_ai_translation.common import po
+from odev.plugins.odev_plugin_ai_translation.common.batch import BatchLLM
+from odev.plugins.odev_plugin_ai_translation.common.cache import ContextCache, TranslationMemory
+from odev.plugins.odev_plugin_ai_translation.common.messages import render_content_part
+from odev.plugins.odev_plugin_ai_translation.common.po import POEntry
+
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 
 logger = logging.getLogger(__name__)
 
 
+CHUNK_TOKEN_LIMIT = 4096
+"""Maximum number of tokens of the terms and prompt sent to the LLM in a single request, context excluded.
+Translations are about as long as their source, this keeps answers well within the output limits of the models.
+"""
+
+REQUEST_TOKEN_LIMIT = int(128_000 * 0.8)
+"""Maximum number of tokens of a whole request, context included: 80% of the smallest context window
+of the models in use, leaving room for the answer.
+"""
+
+WRITE_BUFFER_SIZE = 1 << 20
+"""Size in bytes of the buffer used to write the translated file, which is flushed to disk by blocks of this size."""
+
+CHARS_PER_TOKEN = 4
+"""Average number of characters per token, used to estimate token counts when `tiktoken` is not installed."""
+
+
 class TranslateCommand(DatabaseCommand):
     """Translates an Odoo module into a specified language using an AI model."""
 
@@ -45,10 +83,71 @@ class TranslateCommand(DatabaseCommand):
         default=Path(".").resolve(),
     )
 
+    concurrency = args.Integer(
+        aliases=["--concurrency"],
+        description="Maximum number of parallel requests sent to the LLM.",
+        default=8,
+    )
+
+    batch_size = args.Integer(
+        aliases=["--batch-size"],
+        description="Maximum number of terms sent to the LLM in a single request.",
+        default=25,
+    )
+
+    batch = args.Flag(
+        aliases=["--batch"],
+        description="""Submit the translation through the provider's batch API: cheaper and not subject to the
+        synchronous rate limits, but results may take a while to be available.
+        """,
+    )
+
+    refresh_worktrees = args.Flag(
+        aliases=["--refresh-worktrees"],
+        description="""Update the Odoo worktrees before gathering context from the source code. Needed when the
+        worktrees of the database's version have not been created yet or are outdated.
+        """,
+    )
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Initialize the command."""
         super().__init__(*args, **kwargs)
 
+        self._addons_path_cache: dict[tuple[str, Path], bool] = {}
+        """Results of the checks run on paths to find Odoo addons, by check name and path."""
+
+    @cached_property
+    def _llm_config(self) -> SimpleNamespace:
+        """Snapshot of the LLM settings, read from the configuration and secrets once per run."""
+        llm_order = tuple(self.config.ai.llm_order)
+        api_keys = {}
+
+        for provider in llm_order:
+            key = f"{provider}_api_key"
+            api_keys[key.upper()] = self.odev.store.secrets.get(key.lower(), scope="api", fields=["password"]).password
+
+        return SimpleNamespace(llm_order=llm_order, api_keys=api_keys)
+
+    @cached_property
+    def llm(self) -> LLM:
+        """LLM client shared by all the requests of the command."""
+        os.environ.update(self._llm_config.api_keys)
+        api_keys_hash = hashlib.sha1(json.dumps(self._llm_config.api_keys, sort_keys=True).encode()).hexdigest()
+        return self._get_llm(BatchLLM if self.args.batch else LLM, self._llm_config.llm_order, api_keys_hash)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _get_llm(llm_class: type[LLM], llm_order: tuple[str, ...], api_keys_hash: str) -> LLM:
+        """Build an LLM client, reusing the one built previously in the same process for the same settings.
+
+        Args:
+            llm_class: The class of the client to build.
+            llm_order: The providers to use, by order of preference.
+            api_keys_hash: A hash of the API keys exported to the environment, so that a new client
+                is built whenever they change.
+        """
+        return llm_class(llm_order=list(llm_order))
+
     def _get_module_id(self) -> int | None:
         """Search for the module in the database and return its ID."""
         module_ids = self._database.models["ir.module.module"].search([("name", "=", self.args.module_name)], limit=1)
@@ -67,11 +166,14 @@ class TranslateCommand(DatabaseCommand):
             module_id: The database ID of the module to translate.
 
         Returns:
-            A tuple containing the display name (filename) and the base64-encoded
-            file content, or None if the export fails.
+            A tuple containing the filename and the decoded file content,
+            or None if the export fails.
         """
-        # @TODO: Check if lang is installed, handle error if not
-        language_export_id = self._database.models["base.language.export"].create(
+        if not self._database.models["res.lang"].search_count([("code", "=", self.args.lang), ("active", "=", True)]):
+            return logger.error(f"Language '{self.args.lang}' is not installed in database '{self._database.name}'.")
+
+        export_model = self._database.models["base.language.export"]
+        language_export_id = export_model.create(
             {
                 "lang": self.args.lang,
                 "modules": [(4, module_id)],
@@ -80,51 +182,90 @@ class TranslateCommand(DatabaseCommand):
             }
         )
 
-        translation_action = self._database.models["base.language.export"].act_getfile(language_export_id)
+        translation_action = export_model.act_getfile(language_export_id)
         if not translation_action or "res_id" not in translation_action:
             logger.error("Failed to trigger the file export action in Odoo.")
             return None
 
-        translation_data = self._database.models["base.language.export"].read(
-            [translation_action["res_id"]], fields=["display_name", "data"]
-        )
+        # Read stored fields only, `display_name` would be computed server-side from `name` anyway
+        translation_data = export_model.read([translation_action["res_id"]], fields=["name", "data"])
         if not translation_data:
             logger.error("Failed to read the exported translation data from Odoo.")
             return None
 
-        return translation_data[0]["display_name"], translation_data[0]["data"]
+        # Binary fields always come base64-encoded through RPC, decode them right away so that the encoded
+        # payload is released before the translation starts rather than kept alive until the end of `run`
+        return translation_data[0]["name"], po.decode(translation_data[0]["data"])
 
-    def _get_ai_translation(self, po_content: str) -> str:
+    def _get_ai_translation(self, po_content: str) -> Iterator[str]:
         """Send the .po file content to the configured LLM for translation.
 
         Args:
             po_content: The content of the .po file to be translated.
 
-        Returns:
-            The translated content as a string.
+        Yields:
+            The translated content, entry by entry and in order, as soon as
+            the translation of each entry is available.
         """
-        api_key_list = {}
-
-        for provider in self.config.ai.llm_order:
-            key = f"{provider}_api_key"
-            api_key_list[key.upper()] = self.odev.store.secrets.get(
-                key.lower(), scope="api", fields=["password"]
-            ).password
-
-        os.environ.update(api_key_list)
+        header, *blocks = self._split_po_entries(po_content)
+        entries = [POEntry(block) for block in blocks]
+
+        with TranslationMemory() as memory:
+            msgids = list(dict.fromkeys(entry.msgid for entry in entries if entry.untranslated))
+            translations = memory.get(msgids, self.args.lang, self.llm.model)
+            missing = [msgid for msgid in msgids if msgid not in translations]
+            chunks = self._split_in_chunks(missing, self.args.batch_size, CHUNK_TOKEN_LIMIT)
+            chunks, contexts = self._get_chunk_contexts(chunks, entries, REQUEST_TOKEN_LIMIT)
+
+            logger.debug(
+                f"Found {len(translations)} translations out of {len(msgids)} untranslated terms in the "
+                f"translation memory, calling LLM '{self.llm.model}' for the remaining ones in {len(chunks)} chunks"
+            )
+
+            yield header + ("\n\n" if entries else "\n")
+
+            with progress.spinner(f"Waiting for '{self.llm.model}' to complete the translation"):
+                if self.args.batch:
+                    responses: Iterable[str] = self.llm.batch_completion(
+                        [self._get_chunk_messages(chunk, context) for chunk, context in zip(chunks, contexts)]
+                    )
+                else:
+                    responses = self._translate_chunks(chunks, contexts)
+
+                responses = iter(responses)
+                chunks_iterator = iter(zip(chunks, contexts))
+
+                for index, entry in enumerate(entries, start=1):
+                    while entry.untranslated and entry.msgid not in translations:
+                        chunk, context = next(chunks_iterator)
+                        chunk_translations = dict(
+                            zip(chunk, self._get_chunk_translations(chunk, next(responses), context))
+                        )
+                        memory.set(
+                            {msgid: msgstr for msgid, msgstr in chunk_translations.items() if msgstr},
+                            self.args.lang,
+                            self.llm.model,
+                        )
+                        translations.update(chunk_translations)
+
+                    if entry.untranslated:
+                        entry.translation = translations[entry.msgid]
+
+                    yield str(entry) + ("\n\n" if index < len(entries) else "\n")
 
-        self.llm = LLM(llm_order=self.config.ai.llm_order)
-
-        context = ""
+        logger.info(f"Translation completed successfully using '{self.llm.model}'.")
 
+    @cached_property
+    def _process(self) -> OdoobinProcess:
+        """odoo-bin process whose addons paths contain the sources of the module to translate."""
         if isinstance(self._database, RemoteDatabase):
             database = LocalDatabase(self._database.name)
             process = OdoobinProcess(database, version=self._database.version)
             process.with_edition("enterprise")
 
-            if process.check_addons_path(self.args.path):
+            if self._check_addons_path(process.check_addons_path, self.args.path):
                 process.additional_addons_paths.append(self.args.path)
-            if process.check_addon_path(self.args.path):
+            if self._check_addons_path(process.check_addon_path, self.args.path):
                 process.additional_addons_paths.append(self.args.path.parent)
 
         elif isinstance(self._database, LocalDatabase):
@@ -132,44 +273,390 @@ class TranslateCommand(DatabaseCommand):
         else:
             raise TypeError("Unsupported database type for fetching context.")
 
-        process.update_worktrees()
-        odoo_context = OdooContext(process)
-        context = odoo_context.gather_po_context(po_content)
+        return process
 
-        po_context = Context()
-        po_context.add_file(self.args.module_name, "translation.po", po_content)
+    def _check_addons_path(self, check: Callable[[Path], bool], path: Path) -> bool:
+        """Run a check on a path looking for Odoo addons, reusing the result of previous identical checks.
+
+        Args:
+            check: The check to run, i.e. `OdoobinProcess.check_addons_path` or `OdoobinProcess.check_addon_path`.
+            path: The path to check.
+
+        Returns:
+            The result of the check.
+        """
+        key = (check.__name__, Path(path).resolve())
+
+        if key not in self._addons_path_cache:
+            self._addons_path_cache[key] = check(path)
+
+        return self._addons_path_cache[key]
+
+    def _get_chunk_contexts(
+        self, chunks: list[list[str]], entries: list[POEntry], max_tokens: int
+    ) -> tuple[list[list[str]], list[list[Any]]]:
+        """Gather the context of each chunk of terms to translate.
+
+        Each chunk only gets the context of its own entries, so that the requests do not
+        all carry the context of the whole module. Chunks whose request, context
+        included, would exceed the token limit are split in halves until they fit
+        or only contain a single term. Single terms still exceeding the limit are
+        sent without context.
+
+        Args:
+            chunks: The chunks of terms to translate.
+            entries: The entries of the .po file.
+            max_tokens: The maximum number of tokens of a request.
+
+        Returns:
+            The chunks to translate and the contexts of their entries, in the same order.
+        """
+        entries_by_msgid: dict[str, list[POEntry]] = {}
+
+        for entry in entries:
+            entries_by_msgid.setdefault(entry.msgid, []).append(entry)
+
+        entry_contexts = self._get_entry_contexts(
+            [entry for chunk in chunks for msgid in chunk for entry in entries_by_msgid[msgid]]
+        )
+        pending = list(reversed(chunks))
+        result_chunks: list[list[str]] = []
+        contexts: list[list[Any]] = []
+
+        while pending:
+            chunk = pending.pop()
+            sources = dict.fromkeys(entry.source for msgid in chunk for entry in entries_by_msgid[msgid])
+            context = [entry_contexts[source] for source in sources if entry_contexts[source] is not None]
+            tokens = self._count_message_tokens(self._get_chunk_messages(chunk, context))
+
+            if tokens > max_tokens and len(chunk) > 1:
+                logger.debug(f"Request for {len(chunk)} terms is too large ({tokens} tokens), splitting it")
+                middle = len(chunk) // 2
+                pending.extend([chunk[middle:], chunk[:middle]])
+                continue
+
+            if tokens > max_tokens and context:
+                logger.warning(
+                    f"Context of term {chunk[0]!r} is too large ({tokens} tokens), translating it without context"
+                )
+                context = []
+
+            result_chunks.append(chunk)
+            contexts.append(context)
+
+        return result_chunks, contexts
+
+    def _get_entry_contexts(self, entries: list[POEntry]) -> dict[str, Any]:
+        """Gather the context of entries of the .po file from the Odoo source code.
+
+        Contexts are cached per entry, keyed on the module, Odoo version, revision of the
+        module's local sources and source text of the entry, so that they are reused whatever
+        the target language, the chunks the entry ends up in or the translations already known.
+        The cache is not read when the worktrees are refreshed, as their sources may have changed.
+
+        Args:
+            entries: The entries to gather the context of.
+
+        Returns:
+            The context of each entry, indexed by the source text of the entry.
+        """
+        entries = list({entry.source: entry for entry in entries}.values())
+        keys = {
+            entry.source: ContextCache.key(
+                self.args.module_name, str(self._database.version), self._module_revision, entry.source
+            )
+            for entry in entries
+        }
+
+        with ContextCache() as cache:
+            cached = {} if self.args.refresh_worktrees else cache.get(keys.values())
+            contexts = {source: cached[key] for source, key in keys.items() if key in cached}
+            missing = [entry for entry in entries if entry.source not in contexts]
+            logger.debug(f"Found {len(contexts)} cached contexts, gathering {len(missing)} from the source code")
+
+            if missing:
+                with progress.spinner(f"Gathering context of {len(missing)} terms from the source code"):
+                    for entry in missing:
+                        contexts[entry.source] = self._odoo_context.gather_po_context(entry.block)
+
+                cache.set({keys[entry.source]: contexts[entry.source] for entry in missing})
+
+        return contexts
+
+    @cached_property
+    def _odoo_context(self) -> OdooContext:
+        """Helper gathering context from the Odoo source code, built on the first cache miss only."""
+        return OdooContext(self._process)
+
+    @cached_property
+    def _module_revision(self) -> str:
+        """Revision of the local sources of the module to translate.
+
+        Made of the git revision of the sources and of the last modification time of
+        their files, so that uncommitted changes are taken into account. Translation
+        files are ignored as they are written by this command. Empty if the sources
+        of the module are not found under `--path`.
+        """
+        path = Path(self.args.path).resolve()
+        module_path = path / self.args.module_name
+
+        if not module_path.is_dir():
+            if path.name != self.args.module_name or not (path / "__manifest__.py").is_file():
+                return ""
+
+            module_path = path
+
+        mtime = max(
+            (
+                file.stat().st_mtime_ns
+                for file in module_path.rglob("*")
+                if file.is_file()
+                and file.suffix not in (".po", ".pot", ".pyc")
+                and not {"i18n", ".git", "__pycache__"} & set(file.relative_to(module_path).parts)
+            ),
+            default=0,
+        )
+        return f"{self._get_git_revision(module_path)}:{mtime}"
+
+    def _get_git_revision(self, path: Path) -> str:
+        """Get the current git revision of a directory, or an empty string if it is not in a git repository."""
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=path,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except OSError as error:
+            logger.debug(f"Could not get the git revision of {path}: {error}")
+            return ""
+
+        return result.stdout.strip() if result.returncode == 0 else ""
+
+    def _split_po_entries(self, po_content: str) -> list[str]:
+        """Split the content of a .po file into its individual entries.
+
+        Entries are separated by blank lines, the header block is kept verbatim
+        as the first element of the returned list.
+
+        Args:
+            po_content: The content of the .po file to split.
+
+        Returns:
+            The list of entries, starting with the header.
+        """
+        entries: list[str] = []
+        lines: list[str] = []
 
-        messages = [
+        for line in po_content.splitlines():
+            if line.strip():
+                lines.append(line)
+            elif lines:
+                entries.append("\n".join(lines))
+                lines = []
+
+        if lines:
+            entries.append("\n".join(lines))
+
+        return entries or [""]
+
+    def _split_in_chunks(self, msgids: list[str], size: int, max_tokens: int) -> list[list[str]]:
+        """Split terms into chunks sent to the LLM in a single request each.
+
+        Chunks are filled greedily with consecutive terms until they reach either
+        the maximum number of terms or the maximum number of tokens, prompt included.
+        A term too long to fit within the token limit is sent alone.
+
+        Args:
+            msgids: The terms to split, in order.
+            size: The maximum number of terms per chunk.
+            max_tokens: The maximum number of tokens per chunk.
+
+        Returns:
+            The list of chunks, each containing consecutive terms.
+        """
+        prompt_tokens = self._count_message_tokens(self._get_chunk_messages([], []))
+        chunks: list[list[str]] = []
+        chunk: list[str] = []
+        chunk_tokens = prompt_tokens
+
+        for msgid in msgids:
+            tokens = self._count_tokens(json.dumps(msgid, ensure_ascii=False))
+
+            if chunk and (len(chunk) >= size or chunk_tokens + tokens > max_tokens):
+                chunks.append(chunk)
+                chunk, chunk_tokens = [], prompt_tokens
+
+            chunk.append(msgid)
+            chunk_tokens += tokens
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    def _count_tokens(self, text: str) -> int:
+        """Count the tokens of a text for the current model, or estimate it if `tiktoken` is not installed."""
+        encoding = self._get_encoding(self.llm.model)
+        return len(encoding.encode(text)) if encoding is not None else len(text) // CHARS_PER_TOKEN + 1
+
+    def _count_message_tokens(self, messages: list[dict[str, Any]]) -> int:
+        """Count the tokens of the text content of messages, context included.
+
+        Context objects without a text representation of their own are rendered by
+        the LLM client and cannot be measured here, they are not counted.
+        """
+        tokens = 0
+
+        for message in messages:
+            content = message["content"]
+
+            for part in [content] if isinstance(content, str) else content:
+                if not part:
+                    continue
+
+                try:
+                    tokens += self._count_tokens(render_content_part(part).get("text", ""))
+                except TypeError:
+                    logger.debug(f"Not counting the tokens of message content of type '{type(part).__name__}'")
+
+        return tokens
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _get_encoding(model: str) -> Any:
+        """Get the tokenizer of a model, or None if `tiktoken` is not installed.
+
+        Tokenizers are costly to build and are shared by all the instances of the command.
+        Models unknown to `tiktoken` fall back to the encoding of recent OpenAI models.
+        """
+        if tiktoken is None:
+            return None
+
+        try:
+            return tiktoken.encoding_for_model(model.rpartition("/")[2])
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+
+    def _get_chunk_messages(self, msgids: list[str], contexts: list[Any]) -> list[dict[str, Any]]:
+        """Build the messages to send to the LLM for translating a chunk of terms.
+
+        Args:
+            msgids: The source terms to translate.
+            contexts: The contexts gathered from the Odoo source code for the entries of the terms.
+
+        Returns:
+            The list of messages to send to the LLM.
+        """
+        return [
             {
                 "role": "system",
                 "content": (
-                    f"Translate the provided PO file into {self.args.lang} (ISO code)."
-                    "Just answer the result merged into the original file without the code block string."
+                    f"Translate each of the provided terms of an Odoo module into {self.args.lang} (ISO code). "
+                    "Just answer a JSON array containing the translations in the same order as the provided terms, "
+                    "without the code block string. "
+                    "Keep placeholders (such as %s, %(name)s or {name}), HTML tags and surrounding whitespace as-is. "
                     "If a context is provided, use it to improve the translation of specific terms."
                 ),
             },
             {
                 "role": "user",
                 "content": [
-                    {"type": "text", "text": "Here's the PO source file"},
-                    po_context,
+                    {
+                        "type": "text",
+                        "text": f"Here are the terms to translate\n{json.dumps(msgids, ensure_ascii=False)}",
+                    },
                     {"type": "text", "text": "And the related context files"},
-                    context,
+                    *contexts,
                 ],
             },
         ]
 
-        logger.debug(f"Calling LLM '{self.llm.model}' for translation of PO content (length: {len(po_content)})")
+    def _parse_translations(self, response: str, count: int) -> list[str]:
+        """Parse the translations returned by the LLM for a chunk of terms.
+
+        Args:
+            response: The content of the LLM response.
+            count: The number of terms sent in the request.
 
-        with progress.spinner(f"Waiting for '{self.llm.model}' to complete the translation"):
-            ai_translation = self.llm.completion(messages)
+        Returns:
+            The translations, in the same order as the terms.
+        """
+        content = (response or "").strip()
 
-        if not ai_translation:
-            raise ValueError("AI translation failed or returned no content.")
+        if content.startswith("```"):
+            content = content.partition("\n")[2].rpartition("```")[0]
 
-        logger.info(f"Translation completed successfully using '{self.llm.model}'.")
+        try:
+            translations = json.loads(content)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"AI translation returned invalid content: {error}") from error
+
+        if (
+            not isinstance(translations, list)
+            or len(translations) != count
+            or not all(isinstance(translation, str) for translation in translations)
+        ):
+            raise ValueError(f"AI translation did not return a list of {count} translations.")
+
+        return translations
+
+    def _get_chunk_translations(self, msgids: list[str], response: str, contexts: list[Any]) -> list[str]:
+        """Get the translations of a chunk of terms from the LLM response.
+
+        If the response cannot be matched with the terms of the chunk, the terms
+        are sent again to the LLM one at a time, so that no more than `--concurrency`
+        requests are in flight. Terms that still fail are left untranslated.
+
+        Args:
+            msgids: The terms of the chunk.
+            response: The content of the LLM response for the chunk.
+            contexts: The contexts gathered from the Odoo source code for the chunk.
+
+        Returns:
+            The translations, in the same order as the terms, empty for the terms
+            that could not be translated.
+        """
+        try:
+            return self._parse_translations(response, len(msgids))
+        except ValueError as error:
+            logger.warning(
+                f"Invalid translation of a chunk ({error}), translating its {len(msgids)} terms individually"
+            )
+
+        translations: list[str] = []
+
+        for msgid in msgids:
+            try:
+                translations.append(
+                    self._parse_translations(self.llm.completion(self._get_chunk_messages([msgid], contexts)), 1)[0]
+                )
+            except ValueError as error:
+                logger.warning(f"Leaving term {msgid!r} untranslated: {error}")
+                translations.append("")
+
+        return translations
+
+    def _translate_chunks(self, chunks: list[list[str]], contexts: list[list[Any]]) -> Iterator[str]:
+        """Translate chunks of terms concurrently.
 
-        return ai_translation
+        The LLM client is synchronous, requests are dispatched to a bounded pool of threads
+        so that at most `--concurrency` requests are in flight at the same time.
+
+        Args:
+            chunks: The chunks of terms to translate.
+            contexts: The contexts of each chunk.
+
+        Yields:
+            The LLM responses, in the same order as the input, as soon as
+            they are available.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, self.args.concurrency)) as executor:
+            yield from executor.map(
+                self.llm.completion,
+                [self._get_chunk_messages(chunk, context) for chunk, context in zip(chunks, contexts)],
+            )
 
     def _get_output_path(self) -> Path | None:
         """Determine and validate the output path for the translation file.
@@ -189,7 +676,7 @@ class TranslateCommand(DatabaseCommand):
             return None
 
         module_path = output_path / self.args.module_name
-        if OdoobinProcess.check_addons_path(output_path) and module_path.is_dir():
+        if self._check_addons_path(OdoobinProcess.check_addons_path, output_path) and module_path.is_dir():
             if self.console.confirm(
                 f"A module folder '{self.args.module_name}' already exists in {output_path}. "
                 "Do you want to write the translation file inside its 'i18n' folder?",
@@ -203,23 +690,40 @@ class TranslateCommand(DatabaseCommand):
 
         return output_path
 
-    def _write_translation_file(self, path: Path, filename: str, content: str) -> None:
+    def _write_translation_file(self, path: Path, filename: str, content: Iterable[str]) -> None:
         """Write the translated content to a file.
 
+        Content is written as it is produced, to a temporary file that replaces the
+        target file only once complete so that a failed translation never leaves
+        a truncated file behind.
+
         Args:
             path: The directory where the file will be saved.
             filename: The name of the file.
-            content: The content to write to the file.
+            content: The parts of the content to write to the file, in order.
         """
         full_path = path / filename
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        partial_path = full_path.with_name(f".{filename}.part")
+
+        try:
+            with open(partial_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+                for part in content:
+                    f.write(part)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        partial_path.replace(full_path)
         logger.info(f"Translation file written to {full_path}.")
 
     def run(self) -> None:
         """Execute the translation process."""
         logger.info(f"Translating '{self.args.module_name}' from {self.args.database} into {self.args.lang}")
 
+        output_path = self._get_output_path()
+        if not output_path:
+            return
+
         module_id = self._get_module_id()
         if not module_id:
             return
@@ -227,17 +731,9 @@ class TranslateCommand(DatabaseCommand):
         export_result = self._export_po_file_content(module_id)
         if not export_result:
             return
-        filename, b64_content = export_result
-
-        po_content = base64.b64decode(b64_content).decode("utf-8")
-        ai_translation = self._get_ai_translation(po_content)
-
-        if ai_translation is None:
-            logger.error("AI translation failed.")
-            return
+        filename, po_content = export_result
 
-        output_path = self._get_output_path()
-        if not output_path:
-            return
+        if self.args.refresh_worktrees:
+            self._process.update_worktrees()
 
-        self._write_translation_file(output_path, filename, ai_translation)
+        self._write_translation_file(output_path, filename, self._get_ai_translation(po_content))
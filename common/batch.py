@@ -0,0 +1,239 @@
+"""Submit LLM completions through the providers' asynchronous batch APIs."""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+from odev.common.logging import logging
+
+from odev.plugins.odev_plugin_ai.common.llm import LLM
+from odev.plugins.odev_plugin_ai_translation.common.messages import serialize_messages
+
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_POLL_INITIAL_DELAY = 5.0
+"""Delay in seconds before the first status check of a batch job."""
+
+BATCH_POLL_MAX_DELAY = 300.0
+"""Maximum delay in seconds between two status checks of a batch job."""
+
+BATCH_TIMEOUT = 24 * 3600.0
+"""Maximum time in seconds to wait for a batch job before cancelling it."""
+
+BATCH_COMPLETION_WINDOW = "24h"
+"""Time frame within which the provider must process a batch job."""
+
+BATCH_MAX_TOKENS = 8192
+"""Maximum number of tokens generated per request, for providers requiring it."""
+
+BATCH_PROVIDERS = ("openai", "anthropic")
+"""Providers supporting batch completions."""
+
+
+class BatchLLM(LLM):
+    """LLM wrapper able to submit many completions at once through a provider's batch API.
+
+    Batch jobs are processed asynchronously by the provider, at a lower cost and with
+    rate limits separate from the synchronous completion endpoints.
+    """
+
+    @property
+    def provider(self) -> str:
+        """Name of the provider of the current model."""
+        provider, _, _ = self.model.rpartition("/")
+        return provider or "openai"
+
+    @property
+    def model_name(self) -> str:
+        """Name of the current model without its provider prefix."""
+        return self.model.rpartition("/")[2]
+
+    def batch_completion(self, messages_list: list[list[dict[str, Any]]]) -> list[str]:
+        """Run a batch of completions and wait for their results.
+
+        Args:
+            messages_list: A list of conversations, each being a list of messages
+                as accepted by `completion`.
+
+        Returns:
+            The content of the completions, in the same order as the input.
+        """
+        if not messages_list:
+            return []
+
+        if self.provider not in BATCH_PROVIDERS:
+            raise ValueError(
+                f"Batch completions are not supported for provider '{self.provider}', "
+                f"use one of: {', '.join(BATCH_PROVIDERS)}"
+            )
+
+        requests = {f"chunk-{index}": serialize_messages(messages) for index, messages in enumerate(messages_list)}
+        results = getattr(self, f"_batch_completion_{self.provider}")(requests)
+
+        missing = [custom_id for custom_id in requests if not results.get(custom_id)]
+        if missing:
+            raise ValueError(f"Batch completion returned no content for {', '.join(missing)}")
+
+        return [results[custom_id] for custom_id in requests]
+
+    def _wait_for_batch(self, retrieve: Any, cancel: Any, batch_id: str, done: Any) -> Any:
+        """Poll a batch job with exponential backoff until it is finished.
+
+        The job is cancelled if it does not finish within `BATCH_TIMEOUT` or if waiting
+        is interrupted, so that it is not left running and billed for nothing.
+
+        Args:
+            retrieve: Callable returning the batch job given its ID.
+            cancel: Callable cancelling the batch job given its ID.
+            batch_id: The ID of the batch job.
+            done: Callable returning whether the batch job is finished.
+
+        Returns:
+            The finished batch job.
+        """
+        deadline = time.monotonic() + BATCH_TIMEOUT
+        delay = BATCH_POLL_INITIAL_DELAY
+
+        try:
+            while True:
+                batch = retrieve(batch_id)
+
+                if done(batch):
+                    return batch
+
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    raise TimeoutError(f"Batch '{batch_id}' did not finish within {BATCH_TIMEOUT:.0f} seconds")
+
+                logger.debug(f"Batch '{batch_id}' not finished yet, checking again in {delay:.0f} seconds")
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, BATCH_POLL_MAX_DELAY)
+        except BaseException:
+            logger.warning(f"Cancelling batch '{batch_id}'")
+
+            try:
+                cancel(batch_id)
+            except Exception as error:
+                logger.error(f"Could not cancel batch '{batch_id}': {error}")
+
+            raise
+
+    def _batch_completion_openai(self, requests: dict[str, list[dict[str, Any]]]) -> dict[str, str]:
+        """Run a batch of completions through OpenAI's Batch API."""
+        try:
+            import openai
+        except ImportError as error:
+            raise ImportError(
+                "Batch completions (--batch) with OpenAI models require the 'openai' package, "
+                "install it with `pip install openai`"
+            ) from error
+
+        with openai.OpenAI() as client:
+            return self._batch_completion_openai_client(client, requests)
+
+    def _batch_completion_openai_client(self, client: Any, requests: dict[str, list[dict[str, Any]]]) -> dict[str, str]:
+        """Submit a batch job through an OpenAI client and collect its results."""
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {"model": self.model_name, "messages": messages},
+                }
+            )
+            for custom_id, messages in requests.items()
+        ]
+
+        input_file = client.files.create(file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        logger.debug(f"Submitted batch '{batch.id}' with {len(lines)} requests to OpenAI")
+
+        batch = self._wait_for_batch(
+            client.batches.retrieve,
+            client.batches.cancel,
+            batch.id,
+            lambda batch: batch.status in ("completed", "failed", "expired", "cancelled"),
+        )
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise ValueError(f"Batch '{batch.id}' did not complete successfully (status: {batch.status})")
+
+        results = {}
+
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+
+            result = json.loads(line)
+            response = result.get("response") or {}
+
+            if response.get("status_code") != 200:
+                logger.error(f"Request '{result['custom_id']}' failed in batch '{batch.id}': {result.get('error')}")
+                continue
+
+            results[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+        return results
+
+    def _batch_completion_anthropic(self, requests: dict[str, list[dict[str, Any]]]) -> dict[str, str]:
+        """Run a batch of completions through Anthropic's Message Batches API."""
+        try:
+            import anthropic
+        except ImportError as error:
+            raise ImportError(
+                "Batch completions (--batch) with Anthropic models require the 'anthropic' package, "
+                "install it with `pip install anthropic`"
+            ) from error
+
+        with anthropic.Anthropic() as client:
+            return self._batch_completion_anthropic_client(client, requests)
+
+    def _batch_completion_anthropic_client(
+        self, client: Any, requests: dict[str, list[dict[str, Any]]]
+    ) -> dict[str, str]:
+        """Submit a batch job through an Anthropic client and collect its results."""
+        batch = client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": self.model_name,
+                        "max_tokens": BATCH_MAX_TOKENS,
+                        "system": "\n".join(m["content"] for m in messages if m["role"] == "system"),
+                        "messages": [m for m in messages if m["role"] != "system"],
+                    },
+                }
+                for custom_id, messages in requests.items()
+            ]
+        )
+        logger.debug(f"Submitted batch '{batch.id}' with {len(requests)} requests to Anthropic")
+
+        batch = self._wait_for_batch(
+            client.messages.batches.retrieve,
+            client.messages.batches.cancel,
+            batch.id,
+            lambda batch: batch.processing_status == "ended",
+        )
+
+        results = {}
+
+        for result in client.messages.batches.results(batch.id):
+            if result.result.type != "succeeded":
+                logger.error(f"Request '{result.custom_id}' failed in batch '{batch.id}': {result.result.type}")
+                continue
+
+            results[result.custom_id] = "".join(
+                block.text for block in result.result.message.content if block.type == "text"
+            )
+
+        return results
@@ -0,0 +1,186 @@
+"""Persistent caches speeding up repeated translations."""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Iterable,
+)
+
+from odev.common.logging import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_PATH = Path.home() / ".cache" / "odev"
+"""Directory where the caches of the plugin are stored."""
+
+TRANSLATION_MEMORY_PATH = CACHE_PATH / "ai_translation_cache.sqlite"
+"""Path to the translation memory database."""
+
+CONTEXT_CACHE_PATH = CACHE_PATH / "ai_translation_context.sqlite"
+"""Path to the database of cached contexts."""
+
+CONTEXT_CACHE_MAX_AGE = 30 * 24 * 3600
+"""Age in seconds after which cached contexts are evicted."""
+
+SQLITE_MAX_VARIABLES = 500
+"""Maximum number of parameters bound to a single SQLite query."""
+
+
+class TranslationMemory:
+    """Local store of the translations previously returned by LLMs.
+
+    Translations are indexed by source string, target language and model so that
+    strings already translated in a previous run, or for another module, are not
+    sent to the LLM again.
+    """
+
+    def __init__(self, path: Path = TRANSLATION_MEMORY_PATH):
+        """Open the translation memory, creating it if needed.
+
+        Args:
+            path: Path to the SQLite database file.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS tm(key TEXT PRIMARY KEY, msgstr TEXT, ts INTEGER)")
+        self.connection.commit()
+
+    def __enter__(self) -> TranslationMemory:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.connection.close()
+
+    @staticmethod
+    def key(msgid: str, lang: str, model: str) -> str:
+        """Compute the key under which the translation of a string is stored."""
+        return f"{hashlib.sha1(msgid.encode('utf-8')).hexdigest()}:{lang}:{model}"
+
+    def get(self, msgids: Iterable[str], lang: str, model: str) -> dict[str, str]:
+        """Fetch the known translations of a set of strings.
+
+        Args:
+            msgids: The source strings to look up.
+            lang: The target language.
+            model: The model that produced the translations.
+
+        Returns:
+            A mapping of source strings to their translation, for the strings found in the memory.
+        """
+        keys = {self.key(msgid, lang, model): msgid for msgid in msgids}
+        key_list = list(keys)
+        translations: dict[str, str] = {}
+
+        for start in range(0, len(key_list), SQLITE_MAX_VARIABLES):
+            batch = key_list[start : start + SQLITE_MAX_VARIABLES]
+            cursor = self.connection.execute(
+                f"SELECT key, msgstr FROM tm WHERE key IN ({', '.join('?' * len(batch))})",
+                batch,
+            )
+            translations.update({keys[key]: msgstr for key, msgstr in cursor})
+
+        return translations
+
+    def set(self, translations: dict[str, str], lang: str, model: str) -> None:
+        """Store translations in the memory, replacing existing ones.
+
+        Args:
+            translations: A mapping of source strings to their translation.
+            lang: The target language.
+            model: The model that produced the translations.
+        """
+        timestamp = int(time.time())
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO tm(key, msgstr, ts) VALUES (?, ?, ?)",
+                [(self.key(msgid, lang, model), msgstr, timestamp) for msgid, msgstr in translations.items()],
+            )
+
+
+class ContextCache:
+    """Local store of the context gathered from the Odoo source code for the entries of .po files.
+
+    Contexts are arbitrary objects returned by `OdooContext`, stored pickled and
+    indexed by a key identifying the entry and the sources it was gathered from.
+    Contexts older than `CONTEXT_CACHE_MAX_AGE` are evicted when the cache is opened.
+    """
+
+    def __init__(self, path: Path = CONTEXT_CACHE_PATH):
+        """Open the context cache, creating it if needed.
+
+        Args:
+            path: Path to the SQLite database file.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS ctx(key TEXT PRIMARY KEY, context BLOB, ts INTEGER)")
+
+        with self.connection:
+            self.connection.execute("DELETE FROM ctx WHERE ts < ?", (int(time.time()) - CONTEXT_CACHE_MAX_AGE,))
+
+    def __enter__(self) -> ContextCache:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.connection.close()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """Compute the key under which a context is stored from the parts identifying it."""
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Fetch cached contexts.
+
+        Args:
+            keys: The keys of the contexts to look up.
+
+        Returns:
+            A mapping of keys to their context, for the keys found in the cache.
+        """
+        key_list = list(dict.fromkeys(keys))
+        contexts: dict[str, Any] = {}
+
+        for start in range(0, len(key_list), SQLITE_MAX_VARIABLES):
+            batch = key_list[start : start + SQLITE_MAX_VARIABLES]
+            cursor = self.connection.execute(
+                f"SELECT key, context FROM ctx WHERE key IN ({', '.join('?' * len(batch))})",
+                batch,
+            )
+
+            for key, data in cursor:
+                try:
+                    contexts[key] = pickle.loads(data)
+                except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError) as error:
+                    logger.debug(f"Ignoring unreadable cached context {key}: {error}")
+
+        return contexts
+
+    def set(self, contexts: dict[str, Any]) -> None:
+        """Store contexts in the cache, replacing existing ones.
+
+        Args:
+            contexts: A mapping of keys to the context to store.
+        """
+        timestamp = int(time.time())
+        rows = []
+
+        for key, context in contexts.items():
+            try:
+                rows.append((key, pickle.dumps(context), timestamp))
+            except (pickle.PicklingError, TypeError, AttributeError) as error:
+                logger.debug(f"Could not cache context {key}: {error}")
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO ctx(key, context, ts) VALUES (?, ?, ?)", rows)
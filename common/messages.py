@@ -0,0 +1,51 @@
+"""Conversion of the messages sent to LLMs into plain JSON structures."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def render_content_part(part: Any) -> dict[str, Any]:
+    """Convert a part of the content of a message to a JSON-serializable content part.
+
+    Context objects are rendered through their own string conversion. Objects that
+    do not define one are rejected rather than sent as their default representation.
+
+    Args:
+        part: The content part, either a dictionary, a string or a context object.
+
+    Returns:
+        The content part as a dictionary.
+    """
+    if isinstance(part, dict):
+        return part
+
+    if isinstance(part, str):
+        return {"type": "text", "text": part}
+
+    if type(part).__str__ is object.__str__:
+        raise TypeError(f"Cannot convert message content of type '{type(part).__name__}' to text")
+
+    return {"type": "text", "text": str(part)}
+
+
+def serialize_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Convert messages to a JSON-serializable structure.
+
+    Args:
+        messages: The messages, as accepted by `LLM.completion`.
+
+    Returns:
+        The messages with all the parts of their content converted to dictionaries.
+    """
+    serialized = []
+
+    for message in messages:
+        content = message["content"]
+
+        if not isinstance(content, str):
+            content = [render_content_part(part) for part in content if part]
+
+        serialized.append({**message, "content": content})
+
+    return serialized
@@ -0,0 +1,147 @@
+"""Minimal decoding, parsing and rendering of .po files exported from Odoo."""
+
+from __future__ import annotations
+
+import binascii
+import codecs
+import io
+import re
+
+
+PO_ESCAPES = {"\\": "\\", '"': '"', "n": "\n", "t": "\t", "r": "\r"}
+"""Escape sequences supported in .po strings, mapped to the character they represent."""
+
+PO_ESCAPE_RE = re.compile(r"\\(.)")
+"""Regular expression matching escape sequences in .po strings."""
+
+DECODE_CHUNK_SIZE = 1 << 20
+"""Number of base64 characters decoded at once when reading an exported .po file."""
+
+
+def unescape(value: str) -> str:
+    """Decode the escape sequences of a quoted .po string."""
+    return PO_ESCAPE_RE.sub(lambda match: PO_ESCAPES.get(match.group(1), match.group(0)), value)
+
+
+def escape(value: str) -> str:
+    """Encode a string to be written inside double quotes in a .po file."""
+    return (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t").replace("\r", "\\r")
+    )
+
+
+def decode(b64_content: str) -> str:
+    """Decode the base64-encoded content of a .po file exported from Odoo.
+
+    The payload is decoded by slices of bounded size fed to an incremental UTF-8
+    decoder, so that the full binary content is never held in memory next to
+    the decoded text.
+
+    Args:
+        b64_content: The base64-encoded content, possibly split on multiple lines.
+
+    Returns:
+        The decoded content of the file.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    content = io.StringIO()
+    remainder = ""
+
+    for start in range(0, len(b64_content), DECODE_CHUNK_SIZE):
+        data = remainder + "".join(b64_content[start : start + DECODE_CHUNK_SIZE].split())
+        end = len(data) - len(data) % 4
+        content.write(decoder.decode(binascii.a2b_base64(data[:end])))
+        remainder = data[end:]
+
+    if remainder:
+        raise ValueError("Invalid base64-encoded content: incorrect padding.")
+
+    content.write(decoder.decode(b"", final=True))
+    return content.getvalue()
+
+
+class POEntry:
+    """A single entry of a .po file, as delimited by blank lines.
+
+    The original text of the entry is kept untouched and only the `msgstr` part
+    is rendered again when a translation is set, so that comments, references
+    and formatting exported by Odoo are preserved.
+    """
+
+    def __init__(self, block: str):
+        """Parse an entry from its raw text.
+
+        Args:
+            block: The text of the entry, without surrounding blank lines.
+        """
+        self.block: str = block
+        """Raw text of the entry."""
+
+        self.lines: list[str] = block.splitlines()
+        """Lines of the entry."""
+
+        self.plural: bool = False
+        """Whether the entry has plural forms."""
+
+        self.translation: str | None = None
+        """New translation to render in place of the original `msgstr`."""
+
+        self._msgstr_index: int | None = None
+        values: dict[str, list[str]] = {}
+        keyword: str | None = None
+
+        for index, line in enumerate(self.lines):
+            line = line.strip()
+
+            if line.startswith('"') and keyword is not None:
+                values[keyword].append(unescape(line[1:-1]))
+                continue
+
+            keyword = None
+
+            if not line or line.startswith("#"):
+                continue
+
+            keyword, _, value = line.partition(" ")
+            values[keyword] = [unescape(value.strip()[1:-1])]
+
+            if keyword == "msgid_plural":
+                self.plural = True
+            elif keyword == "msgstr" and self._msgstr_index is None:
+                self._msgstr_index = index
+
+        self.msgid: str = "".join(values.get("msgid", []))
+        """Source string of the entry."""
+
+        self.msgstr: str = "".join(values.get("msgstr", []))
+        """Original translation of the entry."""
+
+    @property
+    def translatable(self) -> bool:
+        """Whether the entry can be translated by setting its `translation`."""
+        return bool(self.msgid) and not self.plural and self._msgstr_index is not None
+
+    @property
+    def source(self) -> str:
+        """Text of the entry without its translation, identical whatever the exported language."""
+        return "\n".join(self.lines[: self._msgstr_index]) if self._msgstr_index is not None else self.block
+
+    @property
+    def untranslated(self) -> bool:
+        """Whether the entry can be translated and has no translation yet."""
+        return self.translatable and not self.msgstr
+
+    def __str__(self) -> str:
+        if self.translation is None or not self.translatable:
+            return self.block
+
+        return "\n".join(self.lines[: self._msgstr_index] + [self._format("msgstr", self.translation)])
+
+    def _format(self, keyword: str, value: str) -> str:
+        """Render a keyword and its value, splitting multiline values the same way Odoo does."""
+        lines = value.splitlines(keepends=True)
+
+        if len(lines) <= 1:
+            return f'{keyword} "{escape(value)}"'
+
+        return "\n".join([f'{keyword} ""', *(f'"{escape(line)}"' for line in lines)])
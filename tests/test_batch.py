@@ -0,0 +1,65 @@
+import sys
+
+import pytest
+
+from odev.plugins.odev_plugin_ai_translation.common import batch
+from odev.plugins.odev_plugin_ai_translation.common.batch import BatchLLM
+
+
+class FakeBatches:
+    def __init__(self, statuses):
+        self.statuses = iter(statuses)
+        self.cancelled: list[str] = []
+
+    def retrieve(self, batch_id):
+        status = next(self.statuses)
+
+        if isinstance(status, BaseException):
+            raise status
+
+        return status
+
+    def cancel(self, batch_id):
+        self.cancelled.append(batch_id)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    monkeypatch.setattr(batch.time, "sleep", lambda delay: None)
+    return BatchLLM.__new__(BatchLLM)
+
+
+class TestWaitForBatch:
+    def wait(self, llm, batches):
+        return llm._wait_for_batch(batches.retrieve, batches.cancel, "batch", lambda status: status == "done")
+
+    def test_done(self, llm):
+        batches = FakeBatches(["running", "running", "done"])
+        assert self.wait(llm, batches) == "done"
+        assert not batches.cancelled
+
+    def test_cancel_on_interrupt(self, llm):
+        batches = FakeBatches(["running", KeyboardInterrupt()])
+
+        with pytest.raises(KeyboardInterrupt):
+            self.wait(llm, batches)
+
+        assert batches.cancelled == ["batch"]
+
+    def test_cancel_on_timeout(self, llm, monkeypatch):
+        monkeypatch.setattr(batch, "BATCH_TIMEOUT", 0)
+        batches = FakeBatches(["running"])
+
+        with pytest.raises(TimeoutError):
+            self.wait(llm, batches)
+
+        assert batches.cancelled == ["batch"]
+
+
+class TestMissingPackage:
+    @pytest.mark.parametrize("package", ["openai", "anthropic"])
+    def test_import_error(self, llm, monkeypatch, package):
+        monkeypatch.setitem(sys.modules, package, None)
+
+        with pytest.raises(ImportError, match=f"require the '{package}' package"):
+            getattr(llm, f"_batch_completion_{package}")({})
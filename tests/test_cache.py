@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from odev.plugins.odev_plugin_ai_translation.common import cache
+from odev.plugins.odev_plugin_ai_translation.common.cache import ContextCache, TranslationMemory
+
+
+@pytest.fixture
+def memory(tmp_path):
+    with TranslationMemory(tmp_path / "tm.sqlite") as memory:
+        yield memory
+
+
+class TestTranslationMemory:
+    def test_get_set(self, memory):
+        memory.set({"Hello": "Bonjour", "Bye": "Au revoir"}, "fr", "model")
+        assert memory.get(["Hello", "Bye", "Unknown"], "fr", "model") == {"Hello": "Bonjour", "Bye": "Au revoir"}
+
+    def test_keyed_on_lang_and_model(self, memory):
+        memory.set({"Hello": "Bonjour"}, "fr", "model")
+        assert memory.get(["Hello"], "de", "model") == {}
+        assert memory.get(["Hello"], "fr", "other") == {}
+
+    def test_replace(self, memory):
+        memory.set({"Hello": "Bonjour"}, "fr", "model")
+        memory.set({"Hello": "Salut"}, "fr", "model")
+        assert memory.get(["Hello"], "fr", "model") == {"Hello": "Salut"}
+
+    def test_batching(self, memory, monkeypatch):
+        monkeypatch.setattr(cache, "SQLITE_MAX_VARIABLES", 3)
+        translations = {f"term {index}": f"terme {index}" for index in range(10)}
+        memory.set(translations, "fr", "model")
+        assert memory.get([*translations, "missing"], "fr", "model") == translations
+
+    def test_batching_past_default_limit(self, memory):
+        count = cache.SQLITE_MAX_VARIABLES * 2 + 1
+        translations = {f"term {index}": f"terme {index}" for index in range(count)}
+        memory.set(translations, "fr", "model")
+        assert memory.get(translations, "fr", "model") == translations
+
+    def test_persistence(self, tmp_path):
+        with TranslationMemory(tmp_path / "tm.sqlite") as memory:
+            memory.set({"Hello": "Bonjour"}, "fr", "model")
+
+        with TranslationMemory(tmp_path / "tm.sqlite") as memory:
+            assert memory.get(["Hello"], "fr", "model") == {"Hello": "Bonjour"}
+
+
+@pytest.fixture
+def contexts(tmp_path):
+    with ContextCache(tmp_path / "context.sqlite") as contexts:
+        yield contexts
+
+
+class TestContextCache:
+    def test_get_set(self, contexts):
+        key = ContextCache.key("sale", "17.0", "revision", "source")
+        assert contexts.get([key]) == {}
+
+        contexts.set({key: {"files": ["models.py"]}})
+        assert contexts.get([key, ContextCache.key("sale", "18.0", "revision", "source")]) == {
+            key: {"files": ["models.py"]}
+        }
+
+    def test_batching(self, contexts, monkeypatch):
+        monkeypatch.setattr(cache, "SQLITE_MAX_VARIABLES", 3)
+        values = {ContextCache.key(str(index)): index for index in range(10)}
+        contexts.set(values)
+        assert contexts.get(values) == values
+
+    def test_unreadable(self, contexts):
+        with contexts.connection:
+            contexts.connection.execute("INSERT INTO ctx VALUES ('key', 'not a pickle', 0)")
+        assert contexts.get(["key"]) == {}
+
+    def test_unpicklable(self, contexts):
+        contexts.set({"lambda": lambda: None, "value": 1})
+        assert contexts.get(["lambda", "value"]) == {"value": 1}
+
+    def test_eviction(self, tmp_path, monkeypatch):
+        with ContextCache(tmp_path / "context.sqlite") as contexts:
+            contexts.set({"key": "context"})
+
+        now = time.time()
+        monkeypatch.setattr(cache.time, "time", lambda: now + cache.CONTEXT_CACHE_MAX_AGE + 1)
+
+        with ContextCache(tmp_path / "context.sqlite") as contexts:
+            assert contexts.get(["key"]) == {}
@@ -0,0 +1,39 @@
+import pytest
+
+from odev.plugins.odev_plugin_ai_translation.common.messages import render_content_part, serialize_messages
+
+
+class Context:
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+
+class TestRenderContentPart:
+    def test_dict(self):
+        part = {"type": "text", "text": "Hello"}
+        assert render_content_part(part) is part
+
+    def test_string(self):
+        assert render_content_part("Hello") == {"type": "text", "text": "Hello"}
+
+    def test_object(self):
+        assert render_content_part(Context("models.py")) == {"type": "text", "text": "models.py"}
+
+    def test_object_without_text(self):
+        with pytest.raises(TypeError):
+            render_content_part(object())
+
+
+class TestSerializeMessages:
+    def test_serialize(self):
+        messages = [
+            {"role": "system", "content": "Translate"},
+            {"role": "user", "content": [{"type": "text", "text": "Terms"}, "", Context("models.py")]},
+        ]
+        assert serialize_messages(messages) == [
+            {"role": "system", "content": "Translate"},
+            {"role": "user", "content": [{"type": "text", "text": "Terms"}, {"type": "text", "text": "models.py"}]},
+        ]
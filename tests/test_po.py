@@ -0,0 +1,91 @@
+import base64
+
+import pytest
+
+from odev.plugins.odev_plugin_ai_translation.common import po
+from odev.plugins.odev_plugin_ai_translation.common.po import POEntry
+
+
+class TestEscape:
+    @pytest.mark.parametrize("value", ["plain", 'quote "a"', "back\\slash", "tab\there", "new\nline", "cr\r\n", "\\n"])
+    def test_round_trip(self, value):
+        assert po.unescape(po.escape(value)) == value
+
+    def test_unknown_sequence_kept(self):
+        assert po.unescape("\\x") == "\\x"
+
+
+class TestDecode:
+    def test_slices_and_line_wrapping(self, monkeypatch):
+        monkeypatch.setattr(po, "DECODE_CHUNK_SIZE", 7)
+        content = 'msgid "Déjà vu — ✓"\nmsgstr "日本語"\n' * 20
+        encoded = base64.encodebytes(content.encode("utf-8")).decode()
+        assert "\n" in encoded.strip()
+        assert po.decode(encoded) == content
+
+    @pytest.mark.parametrize("size", [1, 3, 4, 5, 1 << 20])
+    def test_multibyte_characters_across_slices(self, monkeypatch, size):
+        monkeypatch.setattr(po, "DECODE_CHUNK_SIZE", size)
+        content = "éàü€😀" * 10
+        assert po.decode(base64.b64encode(content.encode("utf-8")).decode()) == content
+
+    def test_incorrect_padding(self):
+        with pytest.raises(ValueError):
+            po.decode("YWJj" + "ZA")
+
+
+class TestPOEntry:
+    def test_translate_escaped(self):
+        block = '#. module: x\n#: code:addons/x/models.py:0\nmsgid "Say \\"hi\\"\\tnow"\nmsgstr ""'
+        entry = POEntry(block)
+        assert entry.msgid == 'Say "hi"\tnow'
+        assert entry.untranslated
+        assert str(entry) == block
+
+        entry.translation = 'Dis "salut"\tmaintenant'
+        assert str(entry) == '#. module: x\n#: code:addons/x/models.py:0\nmsgid "Say \\"hi\\"\\tnow"\n' + (
+            'msgstr "Dis \\"salut\\"\\tmaintenant"'
+        )
+        assert POEntry(str(entry)).msgstr == entry.translation
+
+    def test_translate_multiline(self):
+        block = '#. module: x\nmsgid ""\n"first\\n"\n"second"\nmsgstr ""'
+        entry = POEntry(block)
+        assert entry.msgid == "first\nsecond"
+
+        entry.translation = "premier\nsecond"
+        assert str(entry) == '#. module: x\nmsgid ""\n"first\\n"\n"second"\nmsgstr ""\n"premier\\n"\n"second"'
+        assert POEntry(str(entry)).msgstr == entry.translation
+
+    def test_source_ignores_translation(self):
+        source = '#. module: x\nmsgid "Hello"'
+        assert POEntry(source + '\nmsgstr ""').source == POEntry(source + '\nmsgstr "Bonjour"').source == source
+
+    def test_translated(self):
+        entry = POEntry('msgid "Hello"\nmsgstr "Bonjour"')
+        assert entry.translatable
+        assert not entry.untranslated
+
+    def test_plural_untouched(self):
+        block = 'msgid "%s item"\nmsgid_plural "%s items"\nmsgstr[0] ""\nmsgstr[1] ""'
+        entry = POEntry(block)
+        assert entry.plural
+        assert not entry.untranslated
+
+        entry.translation = "ignored"
+        assert str(entry) == block
+
+    def test_obsolete_untouched(self):
+        block = '#~ msgid "Old"\n#~ msgstr ""'
+        entry = POEntry(block)
+        assert not entry.msgid
+        assert not entry.untranslated
+
+        entry.translation = "ignored"
+        assert str(entry) == block
+
+    def test_header_untouched(self):
+        block = 'msgid ""\nmsgstr ""\n"Project-Id-Version: Odoo\\n"'
+        entry = POEntry(block)
+        assert not entry.translatable
+        assert str(entry) == block
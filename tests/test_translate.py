@@ -0,0 +1,369 @@
+import json
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from odev.plugins.odev_plugin_ai_translation.commands import translate
+from odev.plugins.odev_plugin_ai_translation.commands.translate import TranslateCommand
+from odev.plugins.odev_plugin_ai_translation.common.cache import ContextCache, TranslationMemory
+from odev.plugins.odev_plugin_ai_translation.common.po import POEntry
+
+
+PO_HEADER = '# Translation of Odoo Server.\nmsgid ""\nmsgstr ""\n"Project-Id-Version: Odoo\\n"'
+
+PO_CONTENT = f"""{PO_HEADER}
+
+#. module: sale
+msgid "Hello"
+msgstr ""
+
+#. module: sale
+msgid ""
+"multi\\n"
+"line"
+msgstr ""
+
+msgid "%s item"
+msgid_plural "%s items"
+msgstr[0] ""
+msgstr[1] ""
+
+#. module: sale
+msgid "Hello"
+msgstr ""
+"""
+
+PO_TRANSLATED = f"""{PO_HEADER}
+
+#. module: sale
+msgid "Hello"
+msgstr "HELLO"
+
+#. module: sale
+msgid ""
+"multi\\n"
+"line"
+msgstr ""
+"MULTI\\n"
+"LINE"
+
+msgid "%s item"
+msgid_plural "%s items"
+msgstr[0] ""
+msgstr[1] ""
+
+#. module: sale
+msgid "Hello"
+msgstr "HELLO"
+"""
+
+
+class FakeLLM:
+    """Translates terms to upper case, answering the requests containing `slow` last."""
+
+    model = "provider/model"
+
+    def __init__(self):
+        self.requests: list[list[str]] = []
+        self.max_terms: int | None = None
+        """Answer a single translation to requests with more terms than this, as LLMs sometimes do."""
+
+    def completion(self, messages):
+        terms = json.loads(messages[1]["content"][0]["text"].partition("\n")[2])
+        self.requests.append(terms)
+
+        if any("slow" in term for term in terms):
+            time.sleep(0.1)
+
+        if self.max_terms is not None and len(terms) > self.max_terms:
+            terms = terms[:1]
+
+        return json.dumps([term.upper() for term in terms])
+
+
+class FakeProcess:
+    def __init__(self):
+        self.updates = 0
+
+    def update_worktrees(self):
+        self.updates += 1
+
+
+class FakeOdooContext:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def gather_po_context(self, po_content):
+        self.calls.append(po_content)
+        return f"context of {po_content}"
+
+
+@pytest.fixture
+def command():
+    command = TranslateCommand.__new__(TranslateCommand)
+    command.args = SimpleNamespace(
+        lang="fr", module_name="sale", path=Path("."), concurrency=2, batch_size=2, batch=False, refresh_worktrees=False
+    )
+    command._addons_path_cache = {}
+    return command
+
+
+@pytest.fixture
+def llm(command, tmp_path, monkeypatch):
+    llm = FakeLLM()
+    command.__dict__["llm"] = llm
+    command._get_entry_contexts = lambda entries: {entry.source: "context" for entry in entries}
+    monkeypatch.setattr(translate, "TranslationMemory", lambda: TranslationMemory(tmp_path / "tm.sqlite"))
+    return llm
+
+
+@pytest.fixture
+def odoo_context(command, tmp_path, monkeypatch):
+    odoo_context = FakeOdooContext()
+    command.__dict__["_process"] = FakeProcess()
+    command.__dict__["_odoo_context"] = odoo_context
+    command.__dict__["_module_revision"] = "revision"
+    command._database = SimpleNamespace(version="17.0")
+    monkeypatch.setattr(ContextCache.__init__, "__defaults__", (tmp_path / "context.sqlite",))
+    return odoo_context
+
+
+class TestSplitPoEntries:
+    def test_split(self, command):
+        content = f'{PO_HEADER}\n\n#. module: sale\nmsgid "Hello"\nmsgstr ""\n\n\n  \nmsgid "World"\nmsgstr ""\n'
+        assert command._split_po_entries(content) == [
+            PO_HEADER,
+            '#. module: sale\nmsgid "Hello"\nmsgstr ""',
+            'msgid "World"\nmsgstr ""',
+        ]
+
+    def test_header_only(self, command):
+        assert command._split_po_entries(PO_HEADER + "\n") == [PO_HEADER]
+
+    def test_empty(self, command):
+        assert command._split_po_entries("") == [""]
+
+
+class TestSplitInChunks:
+    @pytest.fixture(autouse=True)
+    def estimate_tokens(self, monkeypatch):
+        """Count tokens with the estimate used without `tiktoken`: 40 characters make 11 tokens."""
+        monkeypatch.setattr(TranslateCommand, "_get_encoding", staticmethod(lambda model: None))
+
+    def test_size(self, command, llm):
+        assert command._split_in_chunks(["a", "b", "c", "d", "e"], 2, 4096) == [["a", "b"], ["c", "d"], ["e"]]
+
+    def test_tokens(self, command, llm):
+        terms = ["a" * 38, "b" * 38, "c" * 38]
+        prompt_tokens = command._count_message_tokens(command._get_chunk_messages([], []))
+        assert command._split_in_chunks(terms, 25, prompt_tokens + 22) == [terms[:2], terms[2:]]
+
+    def test_term_over_limit(self, command, llm):
+        prompt_tokens = command._count_message_tokens(command._get_chunk_messages([], []))
+        assert command._split_in_chunks(["a" * 400, "b", "c"], 25, prompt_tokens + 22) == [["a" * 400], ["b", "c"]]
+
+    def test_empty(self, command, llm):
+        assert command._split_in_chunks([], 2, 4096) == []
+
+
+class TestParseTranslations:
+    def test_parse(self, command):
+        assert command._parse_translations('["Bonjour", "Monde"]', 2) == ["Bonjour", "Monde"]
+
+    def test_code_fence(self, command):
+        assert command._parse_translations('```json\n["Bonjour"]\n```', 1) == ["Bonjour"]
+
+    @pytest.mark.parametrize("response", ["", "Bonjour", '{"Hello": "Bonjour"}', '["Bonjour"]', '["Bonjour", 1]'])
+    def test_invalid(self, command, response):
+        with pytest.raises(ValueError):
+            command._parse_translations(response, 2)
+
+
+class TestGetAiTranslation:
+    def test_translate(self, command, llm):
+        assert "".join(command._get_ai_translation(PO_CONTENT)) == PO_TRANSLATED
+        assert sorted(term for request in llm.requests for term in request) == ["Hello", "multi\nline"]
+
+    def test_translated_entries_untouched(self, command, llm):
+        content = f'{PO_HEADER}\n\nmsgid "Hello"\nmsgstr "Salut"\n\nmsgid "World"\nmsgstr ""\n'
+        expected = f'{PO_HEADER}\n\nmsgid "Hello"\nmsgstr "Salut"\n\nmsgid "World"\nmsgstr "WORLD"\n'
+        assert "".join(command._get_ai_translation(content)) == expected
+        assert llm.requests == [["World"]]
+
+    def test_order(self, command, llm):
+        terms = ["slow", "b", "c", "d"]
+        content = "\n\n".join([PO_HEADER, *(f'msgid "{term}"\nmsgstr ""' for term in terms)])
+        expected = "\n\n".join([PO_HEADER, *(f'msgid "{term}"\nmsgstr "{term.upper()}"' for term in terms)])
+        assert "".join(command._get_ai_translation(content)) == expected + "\n"
+
+    def test_header_only(self, command, llm):
+        assert "".join(command._get_ai_translation(PO_HEADER)) == PO_HEADER + "\n"
+        assert not llm.requests
+
+    def test_translation_memory(self, command, llm):
+        assert "".join(command._get_ai_translation(PO_CONTENT)) == PO_TRANSLATED
+        llm.requests.clear()
+        assert "".join(command._get_ai_translation(PO_CONTENT)) == PO_TRANSLATED
+        assert not llm.requests
+
+    def test_context_without_text(self, command, llm):
+        command._get_entry_contexts = lambda entries: {entry.source: object() for entry in entries}
+        assert "".join(command._get_ai_translation(PO_CONTENT)) == PO_TRANSLATED
+
+    def test_context_per_entry(self, command, llm, odoo_context):
+        del command._get_entry_contexts
+        content = "\n\n".join([PO_HEADER, *(f'msgid "{term}"\nmsgstr ""' for term in ("a", "b", "c", "a"))])
+        "".join(command._get_ai_translation(content))
+        assert odoo_context.calls == [f'msgid "{term}"\nmsgstr ""' for term in "abc"]
+
+        command.args.lang = "de"
+        command.args.batch_size = 1
+        "".join(command._get_ai_translation(content))
+        assert len(odoo_context.calls) == 3
+
+    def test_fallback(self, command, llm):
+        llm.max_terms = 1
+        assert "".join(command._get_ai_translation(PO_CONTENT)) == PO_TRANSLATED
+        assert llm.requests[0] == ["Hello", "multi\nline"]
+        assert sorted(llm.requests[1:]) == [["Hello"], ["multi\nline"]]
+
+    def test_invalid_response(self, command, llm, caplog):
+        completion = llm.completion
+        llm.completion = (
+            lambda messages: "not json" if "Hello" in messages[1]["content"][0]["text"] else completion(messages)
+        )
+        assert "".join(command._get_ai_translation(PO_CONTENT)) == PO_TRANSLATED.replace('msgstr "HELLO"', 'msgstr ""')
+        assert "Leaving term 'Hello' untranslated" in caplog.text
+
+        llm.completion = completion
+        assert "".join(command._get_ai_translation(PO_CONTENT)) == PO_TRANSLATED
+
+
+class TestGetChunkContexts:
+    def test_split_large_requests(self, command, llm, monkeypatch):
+        monkeypatch.setattr(TranslateCommand, "_get_encoding", staticmethod(lambda model: None))
+        entries = [POEntry(f'msgid "{term}"\nmsgstr ""') for term in "abcde"]
+        calls = []
+
+        def get_entry_contexts(entries):
+            calls.append(entries)
+            return {entry.source: f"{entry.msgid}" * 400 for entry in entries}
+
+        command._get_entry_contexts = get_entry_contexts
+        limit = command._count_message_tokens(command._get_chunk_messages(["a", "b"], ["a" * 400, "b" * 400]))
+        chunks, contexts = command._get_chunk_contexts([list("abcde")], entries, limit)
+        assert chunks == [["a", "b"], ["c"], ["d", "e"]]
+        assert contexts == [["a" * 400, "b" * 400], ["c" * 400], ["d" * 400, "e" * 400]]
+        assert len(calls) == 1
+
+    def test_drop_context_of_large_term(self, command, llm, monkeypatch, caplog):
+        monkeypatch.setattr(TranslateCommand, "_get_encoding", staticmethod(lambda model: None))
+        entries = [POEntry(f'msgid "{term}"\nmsgstr ""') for term in "ab"]
+        command._get_entry_contexts = lambda entries: {entry.source: entry.msgid * 400 for entry in entries}
+        limit = command._count_message_tokens(command._get_chunk_messages(["a"], ["a" * 200]))
+        chunks, contexts = command._get_chunk_contexts([["a", "b"]], entries, limit)
+        assert chunks == [["a"], ["b"]]
+        assert contexts == [[], []]
+        assert "Context of term 'a' is too large" in caplog.text
+
+
+class TestGetEntryContexts:
+    def test_cached(self, command, odoo_context):
+        entry = POEntry('#: code:addons/sale/models.py:0\nmsgid "Hello"\nmsgstr ""')
+        context = f"context of {entry.block}"
+        assert command._get_entry_contexts([entry, entry]) == {entry.source: context}
+
+        translated = POEntry(f'{entry.source}\nmsgstr "Bonjour"')
+        assert command._get_entry_contexts([translated]) == {entry.source: context}
+        assert len(odoo_context.calls) == 1
+
+    def test_keyed_on_revision(self, command, odoo_context):
+        entries = [POEntry('msgid "Hello"\nmsgstr ""')]
+        command._get_entry_contexts(entries)
+        command.__dict__["_module_revision"] = "other"
+        command._get_entry_contexts(entries)
+        assert len(odoo_context.calls) == 2
+
+    def test_refresh_worktrees(self, command, odoo_context):
+        entries = [POEntry('msgid "Hello"\nmsgstr ""')]
+        command._get_entry_contexts(entries)
+        command.args.refresh_worktrees = True
+        command._get_entry_contexts(entries)
+        assert len(odoo_context.calls) == 2
+
+
+class TestRun:
+    @pytest.fixture
+    def run(self, command, llm, odoo_context, tmp_path):
+        command.args.database = "db"
+        command._get_output_path = lambda: tmp_path
+        command._get_module_id = lambda: 1
+        command._export_po_file_content = lambda module_id: ("fr.po", PO_CONTENT)
+
+        def run():
+            command.run()
+            return (tmp_path / "fr.po").read_text()
+
+        return run
+
+    def test_run(self, command, run):
+        assert run() == PO_TRANSLATED
+        assert not command._process.updates
+
+    def test_refresh_worktrees(self, command, run):
+        command.args.refresh_worktrees = True
+        assert run() == PO_TRANSLATED
+        assert command._process.updates == 1
+
+
+class TestCheckAddonsPath:
+    def test_memoized(self, command, tmp_path):
+        calls = []
+
+        def check_addons_path(path):
+            calls.append(path)
+            return True
+
+        def check_addon_path(path):
+            calls.append(path)
+            return False
+
+        assert command._check_addons_path(check_addons_path, tmp_path)
+        assert command._check_addons_path(check_addons_path, tmp_path / "sub" / "..")
+        assert not command._check_addons_path(check_addon_path, tmp_path)
+        assert not command._check_addons_path(check_addon_path, tmp_path)
+        assert calls == [tmp_path, tmp_path]
+
+
+class TestModuleRevision:
+    def revision(self, command, path):
+        command.__dict__.pop("_module_revision", None)
+        command.args.path = path
+        return command._module_revision
+
+    def test_sources(self, command, tmp_path):
+        module_path = tmp_path / "sale"
+        (module_path / "i18n").mkdir(parents=True)
+        (module_path / "__manifest__.py").write_text("{}")
+        revision = self.revision(command, tmp_path)
+        assert revision
+        assert self.revision(command, module_path) == revision
+
+        os.utime(module_path / "__manifest__.py", ns=(1, 1))
+        assert self.revision(command, tmp_path) != revision
+
+    def test_translation_files_ignored(self, command, tmp_path):
+        module_path = tmp_path / "sale"
+        (module_path / "i18n").mkdir(parents=True)
+        (module_path / "__manifest__.py").write_text("{}")
+        revision = self.revision(command, tmp_path)
+
+        (module_path / "i18n" / "fr.po").write_text("")
+        (module_path / "i18n" / "sale.pot").write_text("")
+        assert self.revision(command, tmp_path) == revision
+
+    def test_not_local(self, command, tmp_path):
+        assert self.revision(command, tmp_path) == ""